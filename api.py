@@ -3,27 +3,52 @@ FastAPI server for Halloween Quest
 Handles photo uploads and status checks
 """
 
+import asyncio
+import importlib
 import os
+import secrets
 import uuid
 import aiofiles
+from contextlib import asynccontextmanager
 from datetime import datetime
 from typing import Optional
 
-from fastapi import FastAPI, File, UploadFile, HTTPException, Form, Request
+from fastapi import FastAPI, File, UploadFile, HTTPException, Form, Request, Depends, Header, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 
 from config import config
 from database import db
-from bot import send_photo_for_review
+from diagnostics import LoopWatchdog, dump_tasks, profiler
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Prepare upload storage and the loop watchdog when the server starts"""
+    os.makedirs(config.PHOTOS_DIR, exist_ok=True)
+    
+    watchdog = None
+    if config.LOOP_STALL_THRESHOLD > 0:
+        watchdog = LoopWatchdog(config.LOOP_STALL_THRESHOLD)
+        watchdog.start()
+    
+    try:
+        yield
+    finally:
+        if watchdog:
+            watchdog.stop()
+
+async def load_bot():
+    """Import the bot module in a worker thread so loading aiogram never blocks the event loop"""
+    return await asyncio.to_thread(importlib.import_module, "bot")
 
 # FastAPI app
-app = FastAPI(title="Halloween Quest API", version="1.0.0")
+app = FastAPI(title="Halloween Quest API", version="1.0.0", lifespan=lifespan)
 
-# Serve uploaded photos statically (so web app can fetch them from Render)
-app.mount("/uploads/photos", StaticFiles(directory=config.PHOTOS_DIR), name="uploads")
+# Serve uploaded photos statically (so web app can fetch them from Render).
+# The directory is created in lifespan, so don't require it at import time.
+app.mount("/uploads/photos", StaticFiles(directory=config.PHOTOS_DIR, check_dir=False), name="uploads")
 
 
 # CORS middleware
@@ -50,9 +75,6 @@ class PhotoStatusResponse(BaseModel):
     comment: Optional[str] = None
     reviewed_at: Optional[str] = None
 
-# Ensure upload directory exists
-os.makedirs(config.PHOTOS_DIR, exist_ok=True)
-
 @app.get("/")
 async def root():
     """Health check endpoint"""
@@ -129,8 +151,9 @@ async def upload_photo(
             raise HTTPException(status_code=500, detail="Failed to save photo submission")
         
         # Send to parent via Telegram
+        bot = await load_bot()
         parent_chat_id = parent["parent_chat_id"]
-        bot_success = await send_photo_for_review(parent_chat_id, submission_id, task_name, file_path)
+        bot_success = await bot.send_photo_for_review(parent_chat_id, submission_id, task_name, file_path)
         
         if not bot_success:
             raise HTTPException(status_code=500, detail="Failed to send photo to parent")
@@ -176,6 +199,40 @@ async def get_session_photos(session_id: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
+async def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """Allow access only with a valid X-Admin-Token header"""
+    if not config.ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled")
+    if not x_admin_token or not secrets.compare_digest(x_admin_token.encode(), config.ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+@app.get("/api/admin/profile", response_class=PlainTextResponse, dependencies=[Depends(require_admin)])
+async def profile(
+    seconds: float = Query(10, gt=0, le=config.PROFILE_MAX_SECONDS),
+    interval: float = Query(0.01, ge=0.001, le=1)
+):
+    """Sample the event loop thread for N seconds and return collapsed stacks for a flamegraph"""
+    if profiler.running:
+        raise HTTPException(status_code=409, detail="Profiler is already running")
+    
+    profiler.interval = interval
+    profiler.start()
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        profiler.stop()
+    
+    return PlainTextResponse(
+        profiler.collapsed(),
+        headers={"Content-Disposition": "attachment; filename=profile.collapsed"}
+    )
+
+@app.get("/api/admin/tasks", dependencies=[Depends(require_admin)])
+async def list_tasks():
+    """List running asyncio tasks with their stacks"""
+    tasks = dump_tasks()
+    return {"count": len(tasks), "tasks": tasks}
+
 # Error handlers
 @app.exception_handler(404)
 async def not_found_handler(request, exc):
@@ -17,6 +17,7 @@ from aiogram.fsm.state import State, StatesGroup
 
 from config import config
 from database import db
+from recorder import UpdateRecorder
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -132,7 +133,7 @@ async def send_photo_for_review(parent_chat_id: int, submission_id: str, task_na
         logger.error(f"Error sending photo for review: {e}")
         return False
 
-@router.callback_query(F.data.startswith("approve_"))
+@router.callback_query(F.data.startswith("approve_") & ~F.data.startswith("approve_comment_"))
 async def handle_approve(callback_query: CallbackQuery):
     """Handle photo approval"""
     submission_id = callback_query.data.split("_", 1)[1]
@@ -152,7 +153,7 @@ async def handle_approve(callback_query: CallbackQuery):
     else:
         await callback_query.answer("❌ Ошибка при обработке")
 
-@router.callback_query(F.data.startswith("reject_"))
+@router.callback_query(F.data.startswith("reject_") & ~F.data.startswith("reject_comment_"))
 async def handle_reject(callback_query: CallbackQuery):
     """Handle photo rejection"""
     submission_id = callback_query.data.split("_", 1)[1]
@@ -274,9 +275,20 @@ async def main():
     # Register router
     dp.include_router(router)
     
+    # Record incoming updates for replay.py benchmarks
+    recorder = None
+    if config.RECORD_UPDATES:
+        recorder = UpdateRecorder(config.RECORD_UPDATES)
+        dp.update.outer_middleware(recorder)
+        logger.info(f"Recording updates to {config.RECORD_UPDATES}")
+    
     # Start polling
     logger.info("Bot starting...")
-    await dp.start_polling(bot)
+    try:
+        await dp.start_polling(bot)
+    finally:
+        if recorder:
+            await recorder.close()
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -24,6 +24,15 @@ class BotConfig:
     # File Storage
     PHOTOS_DIR: str = os.getenv("PHOTOS_DIR", "./uploads/photos")
     MAX_PHOTO_SIZE: int = 10 * 1024 * 1024  # 10MB
+    
+    # Startup
+    STARTUP_BUDGET: float = float(os.getenv("STARTUP_BUDGET", "3.0"))  # seconds to first response
+    
+    # Diagnostics
+    ADMIN_TOKEN: str = os.getenv("ADMIN_TOKEN", "")  # admin endpoints are disabled when empty
+    LOOP_STALL_THRESHOLD: float = float(os.getenv("LOOP_STALL_THRESHOLD", "0.5"))  # seconds, 0 disables
+    PROFILE_MAX_SECONDS: int = 60
+    RECORD_UPDATES: str = os.getenv("RECORD_UPDATES", "")  # JSONL path for replay.py, empty disables
 
 # Global config instance
 config = BotConfig()
@@ -9,13 +9,30 @@ from datetime import datetime
 from typing import Optional, Dict, Any
 import json
 
+# Bump when the tables below change
+SCHEMA_VERSION = 1
+
 class Database:
     def __init__(self, db_path: str = "halloween_quest.db"):
         self.db_path = db_path
+        self._initialized = False
+    
+    def connect(self):
+        """Open a connection; "file:" paths are SQLite URIs (e.g. shared in-memory databases)"""
+        return aiosqlite.connect(self.db_path, uri=self.db_path.startswith("file:"))
     
     async def init_db(self):
-        """Initialize database tables"""
-        async with aiosqlite.connect(self.db_path) as db:
+        """Initialize database tables once, skipping if the stored schema version is current"""
+        if self._initialized:
+            return
+        
+        async with self.connect() as db:
+            cursor = await db.execute("PRAGMA user_version")
+            row = await cursor.fetchone()
+            if row[0] >= SCHEMA_VERSION:
+                self._initialized = True
+                return
+            
             await db.execute("""
                 CREATE TABLE IF NOT EXISTS family_links (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -57,13 +74,16 @@ class Database:
                 )
             """)
             
+            await db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
             await db.commit()
+        
+        self._initialized = True
     
     async def create_family_link(self, child_session_id: str, parent_chat_id: int, 
                                parent_username: str = None, parent_first_name: str = None) -> bool:
         """Create a link between child and parent"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.connect() as db:
                 await db.execute("""
                     INSERT OR REPLACE INTO family_links 
                     (child_session_id, parent_chat_id, parent_username, parent_first_name)
@@ -77,7 +97,7 @@ class Database:
     
     async def get_parent_by_session(self, child_session_id: str) -> Optional[Dict[str, Any]]:
         """Get parent info by child session ID"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.connect() as db:
             db.row_factory = aiosqlite.Row
             cursor = await db.execute("""
                 SELECT * FROM family_links 
@@ -99,7 +119,7 @@ class Database:
             if not parent:
                 return False
                 
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.connect() as db:
                 await db.execute("""
                     INSERT INTO photo_submissions 
                     (submission_id, child_session_id, parent_chat_id, task_id, task_name, photo_url, photo_path)
@@ -113,7 +133,7 @@ class Database:
     
     async def get_photo_submission(self, submission_id: str) -> Optional[Dict[str, Any]]:
         """Get photo submission by ID"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.connect() as db:
             db.row_factory = aiosqlite.Row
             cursor = await db.execute("""
                 SELECT * FROM photo_submissions WHERE submission_id = ?
@@ -124,7 +144,7 @@ class Database:
     async def update_photo_status(self, submission_id: str, status: str, parent_comment: str = None) -> bool:
         """Update photo submission status"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.connect() as db:
                 await db.execute("""
                     UPDATE photo_submissions 
                     SET status = ?, parent_comment = ?, reviewed_at = CURRENT_TIMESTAMP
@@ -139,7 +159,7 @@ class Database:
     async def save_bot_message(self, chat_id: int, message_id: int, 
                               submission_id: str = None, message_type: str = None):
         """Save bot message info for later reference"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.connect() as db:
             await db.execute("""
                 INSERT INTO bot_messages 
                 (chat_id, message_id, submission_id, message_type)
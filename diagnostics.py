@@ -0,0 +1,148 @@
+"""
+Runtime diagnostics for Halloween Quest Bot + API
+Sampling profiler, asyncio task dumps and event loop stall watchdog
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+def _frame_label(frame) -> str:
+    """Short frame name for collapsed stacks"""
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)})"
+
+class SamplingProfiler:
+    """Periodically samples one thread's stack from a background thread"""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._target_thread_id: Optional[int] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, thread_id: Optional[int] = None):
+        """Start sampling the given thread (the calling thread by default)"""
+        if self.running:
+            raise RuntimeError("Profiler is already running")
+        self._target_thread_id = thread_id or threading.get_ident()
+        self.samples.clear()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop sampling and wait for the sampler thread"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target_thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            self.samples[";".join(reversed(stack))] += 1
+
+    def collapsed(self) -> str:
+        """Samples in collapsed-stack format (flamegraph.pl, speedscope)"""
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+def _await_chain(coro) -> List[Any]:
+    """Frames of a suspended coroutine and everything it is awaiting"""
+    frames = []
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None)
+        if frame is None:
+            break
+        frames.append(frame)
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None)
+    return frames
+
+def dump_tasks() -> List[Dict[str, Any]]:
+    """Describe all asyncio tasks on the running loop with their await stacks"""
+    current = asyncio.current_task()
+    tasks = []
+    for task in asyncio.all_tasks():
+        coro = task.get_coro()
+        frames = _await_chain(coro)
+        stack = traceback.StackSummary.extract((frame, frame.f_lineno) for frame in frames)
+        tasks.append({
+            "name": task.get_name(),
+            "coro": getattr(coro, "__qualname__", repr(coro)),
+            "current": task is current,
+            "stack": [line.rstrip("\n") for line in stack.format()],
+        })
+    return tasks
+
+class LoopWatchdog:
+    """Logs the event loop thread's stack when a loop iteration runs too long"""
+
+    def __init__(self, threshold: float):
+        self.threshold = threshold
+        self.interval = max(threshold / 4, 0.01)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._last_beat = 0.0
+        self._handle: Optional[asyncio.TimerHandle] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def start(self):
+        """Start watching the running event loop"""
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._stop.clear()
+        self._beat()
+        self._thread = threading.Thread(target=self._monitor, name="loop-watchdog", daemon=True)
+        self._thread.start()
+        logger.info(f"Event loop watchdog started (threshold {self.threshold:.3f}s)")
+
+    def stop(self):
+        """Stop watching"""
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _beat(self):
+        self._last_beat = time.monotonic()
+        self._handle = self._loop.call_later(self.interval, self._beat)
+
+    def _monitor(self):
+        stalled_since = None
+        while not self._stop.wait(self.interval):
+            lag = time.monotonic() - self._last_beat - self.interval
+            if lag > self.threshold:
+                if stalled_since is None:
+                    stalled_since = self._last_beat + self.interval
+                    frame = sys._current_frames().get(self._loop_thread_id)
+                    stack = "".join(traceback.format_stack(frame)) if frame else "<no frame>\n"
+                    logger.warning(f"Event loop blocked for more than {self.threshold:.3f}s:\n{stack}")
+            elif stalled_since is not None:
+                logger.warning(f"Event loop was blocked for {self._last_beat - stalled_since:.3f}s")
+                stalled_since = None
+
+# Global profiler instance used by the admin endpoints
+profiler = SamplingProfiler()
@@ -3,45 +3,70 @@ Main runner for Halloween Quest Bot + API
 Runs both Telegram bot and FastAPI server
 """
 
+from startup import timer
+
 import asyncio
 import logging
-from concurrent.futures import ThreadPoolExecutor
-import uvicorn
 
 from config import config
-from bot import main as bot_main
 from database import db
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-async def run_api_server():
+async def run_api_server(server):
     """Run FastAPI server"""
-    config_uvicorn = uvicorn.Config(
-        "api:app",
-        host=config.API_HOST,
-        port=config.API_PORT,
-        log_level="info"
-    )
-    server = uvicorn.Server(config_uvicorn)
     await server.serve()
 
+async def wait_for_api_server(server, api_task):
+    """Wait until uvicorn is accepting connections"""
+    while not server.started:
+        if api_task.done():
+            # Re-raise the server's exception, or fail if it exited without one
+            api_task.result()
+            raise RuntimeError("API server stopped before it started serving")
+        await asyncio.sleep(0.01)
+    timer.mark_first_response()
+
 async def main():
     """Main function to run both bot and API server"""
     logger.info("Starting Halloween Quest Bot + API Server")
-    
-    # Initialize database
-    await db.init_db()
+
+    # Initialize database (skipped when the stored schema version is current)
+    with timer.phase("database init"):
+        await db.init_db()
     logger.info("Database initialized")
-    
-    # Create tasks for bot and API server
-    bot_task = asyncio.create_task(bot_main())
-    api_task = asyncio.create_task(run_api_server())
-    
+
+    # Bring up the API first so the health check answers as early as possible.
+    # Pass the app object rather than "api:app" so it isn't imported twice.
+    with timer.phase("import api"):
+        import uvicorn
+        from api import app, load_bot
+
+    server = uvicorn.Server(uvicorn.Config(
+        app,
+        host=config.API_HOST,
+        port=config.API_PORT,
+        log_level="info"
+    ))
+
     logger.info(f"Starting API server on {config.API_HOST}:{config.API_PORT}")
+    api_task = asyncio.create_task(run_api_server(server))
+    with timer.phase("api server start"):
+        await wait_for_api_server(server, api_task)
+
+    # aiogram is only needed once the API is serving; import it off the
+    # event loop so the health check keeps answering meanwhile
+    with timer.phase("import bot"):
+        bot = await load_bot()
+    bot_main = bot.main
+
     logger.info("Starting Telegram bot...")
-    
+    bot_task = asyncio.create_task(bot_main())
+
+    timer.report(budget=config.STARTUP_BUDGET)
+
     # Run both concurrently
     try:
         await asyncio.gather(bot_task, api_task)
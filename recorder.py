@@ -0,0 +1,43 @@
+"""
+Update recording for Halloween Quest Bot
+Appends incoming Telegram updates to a JSONL file for replay.py benchmarks
+"""
+
+import json
+import time
+from typing import Any, Awaitable, Callable, Dict
+
+import aiofiles
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+
+class UpdateRecorder(BaseMiddleware):
+    """Outer update middleware that appends every incoming update to a JSONL file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.started_at = time.monotonic()
+        self._file = None
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        record = {
+            "offset": round(time.monotonic() - self.started_at, 3),
+            "update": event.model_dump(mode="json", exclude_none=True, by_alias=True),
+        }
+        # File I/O runs in aiofiles' worker thread, off the event loop
+        if self._file is None:
+            self._file = await aiofiles.open(self.path, "a", encoding="utf-8")
+        await self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        await self._file.flush()
+        return await handler(event, data)
+
+    async def close(self):
+        """Close the recording file"""
+        if self._file is not None:
+            await self._file.close()
+            self._file = None
@@ -0,0 +1,322 @@
+"""
+Replay benchmark for Halloween Quest Bot handlers
+Feeds recorded or synthetic Telegram updates through the dispatcher
+against a stubbed Bot session and an in-memory database
+
+Usage:
+    python replay.py generate --out updates.jsonl --families 100
+    python replay.py run updates.jsonl [--paced] [--repeat 5] [--allocations]
+
+Real updates are recorded by running the bot with RECORD_UPDATES=updates.jsonl
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import random
+import sqlite3
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from aiogram import BaseMiddleware, Bot, Dispatcher
+from aiogram.client.session.base import BaseSession
+from aiogram.methods import GetMe, TelegramMethod
+from aiogram.types import Chat, Message, TelegramObject, Update, User
+
+from config import config
+
+# Shared-cache in-memory SQLite; lives while at least one connection is open
+MEMORY_DB = "file:replay?mode=memory&cache=shared"
+
+# Callback data prefix -> handler expected to receive it (longest prefixes first)
+CALLBACK_HANDLERS = [
+    ("approve_comment_", "handle_approve_with_comment"),
+    ("reject_comment_", "handle_reject_with_comment"),
+    ("approve_", "handle_approve"),
+    ("reject_", "handle_reject"),
+    ("comment_", "handle_comment_request"),
+]
+
+class StubSession(BaseSession):
+    """Bot session that answers every API call locally without network access"""
+
+    def __init__(self):
+        super().__init__()
+        self.calls: Counter = Counter()
+        self._message_ids = itertools.count(1)
+
+    async def make_request(self, bot: Bot, method: TelegramMethod, timeout: Optional[int] = None) -> Any:
+        self.calls[type(method).__name__] += 1
+        if isinstance(method, GetMe):
+            return User(id=bot.id, is_bot=True, first_name="Replay", username=config.BOT_USERNAME)
+        if method.__returning__ is Message:
+            chat_id = getattr(method, "chat_id", 0)
+            return Message(
+                message_id=next(self._message_ids),
+                date=datetime.now(),
+                chat=Chat(id=chat_id if isinstance(chat_id, int) else 0, type="private"),
+            )
+        return True
+
+    async def stream_content(self, url: str, headers=None, timeout: int = 30,
+                             chunk_size: int = 65536, raise_for_status: bool = True):
+        yield b""
+
+    async def close(self):
+        pass
+
+class HandlerTimer(BaseMiddleware):
+    """Inner middleware that remembers which handler ran and how long it took"""
+
+    def __init__(self):
+        self.handler_name: Optional[str] = None
+        self.handler_time = 0.0
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        self.handler_name = data["handler"].callback.__name__
+        start = time.perf_counter()
+        try:
+            return await handler(event, data)
+        finally:
+            self.handler_time = time.perf_counter() - start
+
+def _user(user_id: int) -> Dict[str, Any]:
+    return {"id": user_id, "is_bot": False, "first_name": f"Parent{user_id}", "username": f"parent{user_id}"}
+
+def _chat(user_id: int) -> Dict[str, Any]:
+    return {"id": user_id, "type": "private"}
+
+def generate_updates(families: int = 100, seed: int = 0) -> List[Dict[str, Any]]:
+    """Synthetic updates covering linking, help, approve/reject and the comment flow"""
+    rng = random.Random(seed)
+    update_ids = itertools.count(1)
+    message_ids = itertools.count(1)
+    now = int(time.time())
+    offset = 0.0
+    records = []
+
+    def add(update: Dict[str, Any]):
+        nonlocal offset
+        offset += rng.uniform(0.05, 0.5)
+        update["update_id"] = next(update_ids)
+        records.append({"offset": round(offset, 3), "update": update})
+
+    def message(user_id: int, text: str) -> Dict[str, Any]:
+        msg = {"message_id": next(message_ids), "date": now, "chat": _chat(user_id),
+               "from": _user(user_id), "text": text}
+        if text.startswith("/"):
+            msg["entities"] = [{"type": "bot_command", "offset": 0, "length": len(text.split(" ", 1)[0])}]
+        return {"message": msg}
+
+    def callback(user_id: int, data: str) -> Dict[str, Any]:
+        review = {"message_id": next(message_ids), "date": now, "chat": _chat(user_id),
+                  "from": {"id": 1, "is_bot": True, "first_name": "Replay"}, "caption": "review"}
+        return {"callback_query": {"id": str(next(message_ids)), "from": _user(user_id),
+                                   "chat_instance": str(user_id), "message": review, "data": data}}
+
+    for family in range(families):
+        user_id = 1000 + family
+        add(message(user_id, f"/start quest_{family:06d}"))
+        if rng.random() < 0.2:
+            add(message(user_id, "/help"))
+        for task in range(rng.randint(1, 4)):
+            submission_id = f"{family:06d}-{task}"
+            choice = rng.random()
+            if choice < 0.5:
+                add(callback(user_id, f"approve_{submission_id}"))
+            elif choice < 0.75:
+                add(callback(user_id, f"reject_{submission_id}"))
+            else:
+                add(callback(user_id, f"comment_{submission_id}"))
+                add(message(user_id, "Молодец! Но попробуй сделать тень более четкой"))
+                decision = "approve" if rng.random() < 0.5 else "reject"
+                add(callback(user_id, f"{decision}_comment_{submission_id}"))
+    return records
+
+def load_records(path: str) -> List[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def save_records(path: str, records: List[Dict[str, Any]]):
+    with open(path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+def _callback_route(update: Dict[str, Any]):
+    """(submission_id, expected handler) for a review callback update, else None"""
+    data = update.get("callback_query", {}).get("data") or ""
+    for prefix, handler_name in CALLBACK_HANDLERS:
+        if data.startswith(prefix):
+            return data[len(prefix):], handler_name
+    return None
+
+async def seed_submissions(db, records: List[Dict[str, Any]]) -> int:
+    """Create a pending photo submission for every submission ID the callbacks refer to"""
+    seeded = set()
+    for record in records:
+        route = _callback_route(record["update"])
+        if route is None or route[0] in seeded:
+            continue
+        chat_id = record["update"]["callback_query"]["from"]["id"]
+        session_id = f"replay_{chat_id}"
+        await db.create_family_link(session_id, chat_id)
+        await db.submit_photo(route[0], session_id, 0, "Replay task", "", "")
+        seeded.add(route[0])
+    return len(seeded)
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+async def run_replay(records: List[Dict[str, Any]], paced: bool = False, repeat: int = 1,
+                     allocations: bool = False) -> Dict[str, Any]:
+    """Replay records through the bot dispatcher and collect timing statistics"""
+    import bot as bot_module
+    from database import Database
+
+    # Keep one connection open so the shared in-memory database survives the run
+    anchor = sqlite3.connect(MEMORY_DB, uri=True)
+    original_db = bot_module.db
+    bot_module.db = Database(MEMORY_DB)
+    await bot_module.db.init_db()
+    await seed_submissions(bot_module.db, records)
+
+    # A local dispatcher leaves bot.dp untouched
+    dp = Dispatcher()
+    dp.include_router(bot_module.router)
+    handler_timer = HandlerTimer()
+    dp.message.middleware(handler_timer)
+    dp.callback_query.middleware(handler_timer)
+
+    session = StubSession()
+    replay_bot = Bot(token=config.BOT_TOKEN, session=session)
+
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    handler_times: Dict[str, List[float]] = defaultdict(list)
+    peaks: Dict[str, List[int]] = defaultdict(list)
+    misrouted: Counter = Counter()
+
+    if allocations:
+        tracemalloc.start()
+
+    started = time.perf_counter()
+    try:
+        for _ in range(repeat):
+            pass_start = time.perf_counter()
+            for record in records:
+                if paced:
+                    delay = pass_start + record.get("offset", 0) - time.perf_counter()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+
+                update = Update.model_validate(record["update"], context={"bot": replay_bot})
+                handler_timer.handler_name = None
+                handler_timer.handler_time = 0.0
+                if allocations:
+                    tracemalloc.reset_peak()
+                    before = tracemalloc.get_traced_memory()[0]
+
+                start = time.perf_counter()
+                await dp.feed_update(replay_bot, update)
+                elapsed = time.perf_counter() - start
+
+                name = handler_timer.handler_name or "unhandled"
+                route = _callback_route(record["update"])
+                if route and route[1] != name:
+                    misrouted[f"{route[1]} -> {name}"] += 1
+                latencies[name].append(elapsed)
+                handler_times[name].append(handler_timer.handler_time)
+                if allocations:
+                    peaks[name].append(tracemalloc.get_traced_memory()[1] - before)
+        total = time.perf_counter() - started
+    finally:
+        if allocations:
+            tracemalloc.stop()
+        await replay_bot.session.close()
+        bot_module.db = original_db
+        # aiogram has no public way to detach a router; undo include_router by hand
+        dp.sub_routers.remove(bot_module.router)
+        bot_module.router._parent_router = None
+        anchor.close()
+
+    return {
+        "updates": sum(len(values) for values in latencies.values()),
+        "total": total,
+        "latencies": latencies,
+        "handler_times": handler_times,
+        "peaks": peaks,
+        "api_calls": session.calls,
+        "misrouted": misrouted,
+    }
+
+def print_report(stats: Dict[str, Any]):
+    """Print throughput and per-handler latency table"""
+    updates, total = stats["updates"], stats["total"]
+    print(f"Replayed {updates} updates in {total:.3f}s ({updates / total:.1f} updates/s)")
+    print()
+
+    header = f"{'handler':<30} {'count':>6} {'mean ms':>8} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8} {'routing ms':>10}"
+    if stats["peaks"]:
+        header += f" {'peak KiB':>9}"
+    print(header)
+    for name, values in sorted(stats["latencies"].items(), key=lambda item: -sum(item[1])):
+        mean = sum(values) / len(values)
+        routing = mean - sum(stats["handler_times"][name]) / len(values)
+        line = (f"{name:<30} {len(values):>6} {mean * 1000:>8.3f} {_percentile(values, 0.5) * 1000:>8.3f} "
+                f"{_percentile(values, 0.95) * 1000:>8.3f} {max(values) * 1000:>8.3f} {routing * 1000:>10.3f}")
+        if stats["peaks"]:
+            peaks = stats["peaks"][name]
+            line += f" {sum(peaks) / len(peaks) / 1024:>9.1f}"
+        print(line)
+
+    if stats["misrouted"]:
+        print()
+        print("WARNING: callbacks reached the wrong handler (expected -> actual):")
+        for route, count in stats["misrouted"].most_common():
+            print(f"  {route}: {count}")
+
+    print()
+    print("Bot API calls: " + ", ".join(f"{name}={count}" for name, count in stats["api_calls"].most_common()))
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay benchmark for Halloween Quest Bot handlers")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    generate = commands.add_parser("generate", help="write synthetic updates to a JSONL file")
+    generate.add_argument("--out", default="updates.jsonl")
+    generate.add_argument("--families", type=int, default=100, help="number of parent/child pairs")
+    generate.add_argument("--seed", type=int, default=0)
+
+    run = commands.add_parser("run", help="replay updates from a JSONL file")
+    run.add_argument("path")
+    run.add_argument("--paced", action="store_true", help="keep recorded gaps between updates")
+    run.add_argument("--repeat", type=int, default=1, help="replay the file this many times")
+    run.add_argument("--allocations", action="store_true", help="track peak memory per update (slower)")
+
+    args = parser.parse_args()
+
+    if args.command == "generate":
+        records = generate_updates(args.families, args.seed)
+        save_records(args.out, records)
+        print(f"Wrote {len(records)} updates to {args.out}")
+        return
+
+    # Per-update dispatcher logging would dominate the measurements
+    logging.getLogger("aiogram.event").setLevel(logging.WARNING)
+    logging.getLogger("bot").setLevel(logging.WARNING)
+
+    stats = asyncio.run(run_replay(load_records(args.path), args.paced, args.repeat, args.allocations))
+    print_report(stats)
+
+if __name__ == "__main__":
+    main()
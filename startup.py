@@ -0,0 +1,56 @@
+"""
+Startup timing for Halloween Quest Bot + API
+Records how long each boot phase takes and logs a breakdown
+"""
+
+import logging
+import time
+from contextlib import contextmanager
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class StartupTimer:
+    def __init__(self, started_at: Optional[float] = None):
+        self.started_at = started_at if started_at is not None else time.perf_counter()
+        self.phases: List[Tuple[str, float]] = []
+        self.first_response_at: Optional[float] = None
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time a named startup phase"""
+        phase_start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - phase_start))
+
+    def mark_first_response(self):
+        """Remember the moment the health check can answer"""
+        if self.first_response_at is None:
+            self.first_response_at = time.perf_counter()
+
+    @property
+    def time_to_first_response(self) -> Optional[float]:
+        """Seconds from process start until the health check can answer"""
+        if self.first_response_at is None:
+            return None
+        return self.first_response_at - self.started_at
+
+    def report(self, budget: float = 0.0):
+        """Log per-phase startup breakdown and check it against the budget"""
+        total = time.perf_counter() - self.started_at
+        lines = ["Startup timing:"]
+        for name, elapsed in self.phases:
+            lines.append(f"  {name:<24} {elapsed * 1000:8.1f} ms")
+        if self.time_to_first_response is not None:
+            lines.append(f"  {'first response ready':<24} {self.time_to_first_response * 1000:8.1f} ms")
+        lines.append(f"  {'total':<24} {total * 1000:8.1f} ms")
+        logger.info("\n".join(lines))
+
+        ttfr = self.time_to_first_response
+        if budget and ttfr is not None and ttfr > budget:
+            logger.warning(f"Time to first response {ttfr:.2f}s exceeds budget of {budget:.2f}s")
+
+# Global timer, created as early as possible by main.py
+timer = StartupTimer()
@@ -0,0 +1,45 @@
+"""
+Cold start test: the health check must answer within the startup budget
+without loading aiogram
+"""
+
+import asyncio
+import sys
+import time
+
+import aiohttp
+
+from config import config
+
+async def start_and_request_health_check():
+    started_at = time.perf_counter()
+
+    # Same startup path as main.py: import api, serve the app object
+    import uvicorn
+    from api import app
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=0, log_level="warning"))
+    api_task = asyncio.create_task(server.serve())
+    try:
+        while not server.started:
+            assert not api_task.done(), "API server stopped before it started serving"
+            await asyncio.sleep(0.01)
+
+        port = server.servers[0].sockets[0].getsockname()[1]
+        async with aiohttp.ClientSession() as session:
+            async with session.get(f"http://127.0.0.1:{port}/") as response:
+                assert response.status == 200
+                body = await response.json()
+        return time.perf_counter() - started_at, body
+    finally:
+        server.should_exit = True
+        await api_task
+
+def test_time_to_first_response(monkeypatch, tmp_path):
+    monkeypatch.setattr(config, "PHOTOS_DIR", str(tmp_path / "photos"))
+
+    elapsed, body = asyncio.run(start_and_request_health_check())
+
+    assert body["message"] == "Halloween Quest API is running"
+    assert elapsed < config.STARTUP_BUDGET, f"first response took {elapsed:.2f}s"
+    assert "aiogram" not in sys.modules